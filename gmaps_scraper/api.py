@@ -1,6 +1,13 @@
 from __future__ import annotations
-import os, time, requests
-from typing import Any, Dict, List, Optional
+import functools, os, random, time, requests
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson  # decodes the response bytes directly
+except ImportError:  # pragma: no cover
+    orjson = None
 
 __all__ = ["getenv_api_key", "search_text"]
 
@@ -15,16 +22,31 @@ def getenv_api_key() -> str:
 
 PLACES_BASE = "https://places.googleapis.com/v1"
 
-def _request_json(
-    path: str,
-    payload: Dict,
-    field_mask: str,
-    api_key: str,
-    max_retries: int = 5,
-    timeout: int = 30,
-) -> Dict:
-    # normalize fields list
-    raw = [x.strip() for x in field_mask.split(",") if x.strip()]
+# seconds before a freshly issued nextPageToken is accepted by the API
+PAGE_TOKEN_DELAY = 2.1
+
+# shared session: keep-alive + TLS reuse across pages and queries
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
+_RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+_MAX_BACKOFF = 16.0
+# cap on a server-supplied Retry-After, so one 429 can't stall a worker for long
+_MAX_RETRY_AFTER = _MAX_BACKOFF * 4
+
+def _retry_delay(resp: requests.Response, backoff: float) -> float:
+    """Seconds to wait before retrying: Retry-After (capped) on 429, jittered backoff otherwise."""
+    if resp.status_code == 429:
+        try:
+            return min(max(0.0, float(resp.headers.get("Retry-After", ""))), _MAX_RETRY_AFTER)
+        except ValueError:
+            pass
+    return backoff * (1 + random.random() * 0.25)
+
+@functools.lru_cache(maxsize=32)
+def _normalize_field_mask(raw_mask: str) -> str:
+    """Strip, dedupe (order-preserving) and ensure nextPageToken is requested."""
+    raw = [x.strip() for x in raw_mask.split(",") if x.strip()]
     norm = []
     have_next = False
     for f in raw:
@@ -41,21 +63,46 @@ def _request_json(
     for f in norm:
         if f not in seen:
             seen.add(f); fields.append(f)
+    return ",".join(fields)
 
+def _request_json(
+    path: str,
+    payload: Dict,
+    field_mask: str,
+    api_key: str,
+    max_retries: int = 5,
+    timeout: int = 30,
+) -> Dict:
+    """POST to Places API v1; `field_mask` must already be normalized (see _normalize_field_mask)."""
     headers = {
         "Content-Type": "application/json",
         "X-Goog-Api-Key": api_key,
-        "X-Goog-FieldMask": ",".join(fields),
+        "X-Goog-FieldMask": field_mask,
     }
 
     url = f"https://places.googleapis.com/v1/{path}"
-    resp = requests.post(url, headers=headers, json=payload, timeout=30)
-    if resp.status_code >= 400:
-        raise RuntimeError(f"HTTP {resp.status_code}: {resp.text[:1000]}")
-    return resp.json()
+    backoff = 1.0
+    for attempt in range(1, max_retries + 1):
+        resp = _SESSION.post(url, headers=headers, json=payload, timeout=timeout)
+        # Handle retryable (429/5xx) while attempts remain
+        if resp.status_code in _RETRYABLE_STATUS and attempt < max_retries:
+            time.sleep(_retry_delay(resp, backoff))
+            backoff = min(backoff * 2, _MAX_BACKOFF)
+            continue
+        if resp.status_code >= 400:
+            raise RuntimeError(f"HTTP {resp.status_code}: {resp.text[:1000]}")
+        if orjson is not None:
+            return orjson.loads(resp.content)
+        return resp.json()
+    raise RuntimeError(f"Exhausted retries on {url}")
 
 
 
+def _call_later(delay: float, fn: Callable[..., Dict], *args: Any) -> Dict:
+    time.sleep(delay)
+    return fn(*args)
+
+
 def _paginate(
     path: str,
     payload: Dict,
@@ -63,30 +110,44 @@ def _paginate(
     api_key: str,
     max_pages: int = 10,
 ) -> List[Dict]:
-    """Iterate through paginated results using nextPageToken."""
-    all_places: List[Dict] = []
-    page = 0
-    token = None
-
-    while page < max_pages:
-        body = dict(payload)
-        if token:
-            body["pageToken"] = token
-
-        data = _request_json(path, body, field_mask, api_key)
+    """Iterate through paginated results using nextPageToken, de-duplicated by place id.
 
-        # In v1, results are in "places"
-        places = data.get("places", [])
-        all_places.extend(places)
+    The next page is scheduled on a worker thread as soon as its token
+    arrives, so the token settle delay overlaps with handling the current page.
+    """
+    if max_pages < 1:
+        return []
 
-        # Pagination token: appears if there are more results
-        token = data.get("nextPageToken")
-        if not token:
-            break
-
-        # wait for token to become valid
-        time.sleep(2.1)
-        page += 1
+    all_places: List[Dict] = []
+    seen: Set[str] = set()
+    page = 0
+    body: Optional[Dict] = None  # copied from payload only once a token shows up
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        pending = pool.submit(_request_json, path, payload, field_mask, api_key)
+        while pending is not None:
+            data = pending.result()
+            page += 1
+            pending = None
+
+            # Pagination token: appears if there are more results
+            token = data.get("nextPageToken")
+            if token and page < max_pages:
+                # the previous request has finished, so the body can be reused
+                if body is None:
+                    body = dict(payload)
+                body["pageToken"] = token
+                # wait for token to become valid, off the main thread
+                pending = pool.submit(
+                    _call_later, PAGE_TOKEN_DELAY, _request_json, path, body, field_mask, api_key
+                )
+
+            # In v1, results are in "places"; de-dupe by id or name as they arrive
+            for p in data.get("places", []):
+                pid = p.get("id") or p.get("name")
+                if pid and pid not in seen:
+                    seen.add(pid)
+                    all_places.append(p)
 
     return all_places
 
@@ -108,4 +169,5 @@ def search_text(
         payload["regionCode"] = region_code
 
     api_key = getenv_api_key()
-    return _paginate("places:searchText", payload, field_mask, api_key, max_pages=max_pages)
+    mask = _normalize_field_mask(field_mask)
+    return _paginate("places:searchText", payload, mask, api_key, max_pages=max_pages)
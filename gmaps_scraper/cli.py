@@ -3,7 +3,7 @@ import argparse
 from pathlib import Path
 from typing import Any, Dict, List
 from .api import search_text
-from .normalize import flatten_place
+from .normalize import flatten_place, want_fields
 from .utils import slugify, now_stamp, write_csv, write_json
 
 DEFAULT_FIELDS = ",".join([
@@ -34,6 +34,7 @@ def parse_args():
 
 def main():
     args = parse_args()
+    stamp = now_stamp()  # one timestamp shared by every file of this run
     if args.max_pages < 1 or args.max_pages > 3:
         raise SystemExit("--max-pages must be between 1 and 3 for Text Search.")
 
@@ -45,22 +46,14 @@ def main():
         region_code=args.region_code,
     )
 
-    # de-dupe by id or name
-    seen, uniq = set(), []
-    for p in places:
-        pid = p.get("id") or p.get("name")
-        if pid and pid not in seen:
-            seen.add(pid); uniq.append(p)
-    places = uniq
-
-    fields = [f.strip() for f in args.fields.split(",") if f.strip()]
-    rows = [flatten_place(p, fields) for p in places]
-
     out_dir = Path(args.out_dir)
-    base = f"{slugify(args.query)}_{args.max_pages}p_{now_stamp()}"
+    base = f"{slugify(args.query)}_{args.max_pages}p_{stamp}"
     out_dir.mkdir(parents=True, exist_ok=True)
 
     if args.format in ("csv","both"):
+        # flatten (and JSON-encode nested cells) only when a CSV is written
+        want = want_fields(args.fields.split(","))
+        rows = [flatten_place(p, want=want) for p in places]
         write_csv(rows, out_dir / f"{base}.csv")
     if args.format in ("json","both"):
         write_json(places, out_dir / f"{base}.raw.json")
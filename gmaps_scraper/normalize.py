@@ -1,8 +1,8 @@
 from __future__ import annotations
-from typing import Any, Dict, List, Optional
+from typing import AbstractSet, Any, Dict, FrozenSet, Iterable, List, Optional
 from .utils import _get, _as_json, _join
 
-__all__ = ["flatten_place"]
+__all__ = ["flatten_place", "want_fields"]
 
 # Map Google enum strings to compact integers while keeping the enum too.
 
@@ -28,6 +28,20 @@ _ADDR_TYPE_TO_COL = {
     "postal_code_suffix": "addr_postal_code_suffix",
 }
 
+# requested keys that flatten_place expands explicitly; anything else
+# goes through the catch-all at the end
+
+_HANDLED_KEYS = frozenset({
+    "id","name","displayName","formattedAddress","shortFormattedAddress","primaryType",
+    "primaryTypeDisplayName","internationalPhoneNumber","websiteUri","googleMapsUri",
+    "businessStatus","pureServiceAreaBusiness","rating","userRatingCount","types",
+    "location","viewport","plusCode","priceLevel","priceRange","currentOpeningHours",
+    "regularOpeningHours","containingPlaces","addressComponents","reviews","reviewSummary",
+})
+
+# distinct address columns plus addr_country_code; once all are set we can stop
+_ADDR_COL_COUNT = len(set(_ADDR_TYPE_TO_COL.values())) + 1
+
 
 # --- helpers ---------------------------------------------------------------
 
@@ -37,7 +51,9 @@ def _expand_address_components(ac_list: List[Dict[str, Any]]) -> Dict[str, Any]:
     if not isinstance(ac_list, list):
         return out
     for comp in ac_list:
-        types = comp.get("types", []) or []
+        types = comp.get("types")
+        if not types:
+            continue
         long_text = comp.get("longText") or comp.get("long_name")
         short_text = comp.get("shortText") or comp.get("short_name")
         for t in types:
@@ -45,10 +61,13 @@ def _expand_address_components(ac_list: List[Dict[str, Any]]) -> Dict[str, Any]:
             if not col:
                 continue
             # prefer longText; fall back to shortText
-            out.setdefault(col, long_text or short_text)
+            if col not in out:
+                out[col] = long_text or short_text
             # country code is useful too
-            if t == "country":
-                out.setdefault("addr_country_code", short_text)
+            if t == "country" and "addr_country_code" not in out:
+                out["addr_country_code"] = short_text
+        if len(out) == _ADDR_COL_COUNT:
+            break
     return out
 
 def _expand_hours(prefix: str, hours: Dict[str, Any]) -> Dict[str, Any]:
@@ -100,20 +119,32 @@ def _expand_plus_code(pc: Dict[str, Any]) -> Dict[str, Any]:
 
 # --- main flattener --------------------------------------------------------
 
-def flatten_place(p: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+def want_fields(fields: Iterable[str]) -> FrozenSet[str]:
+    """
+    Normalize a requested field list into a set of bare keys
+    (stripped, without the 'places.' prefix). Build it once per batch and
+    pass it to `flatten_place(..., want=...)` for O(1) membership tests.
+    """
+    return frozenset(f.strip().replace("places.", "") for f in fields if f and f.strip())
+
+def flatten_place(
+    p: Dict[str, Any],
+    fields: Iterable[str] = (),
+    *,
+    want: Optional[AbstractSet[str]] = None,
+) -> Dict[str, Any]:
     """
     Flatten a Google Places (v1) result into analysis-friendly columns.
-    - Respects the requested `fields` list (expects 'places.*' names).
+    - Respects the requested `fields` (expects 'places.*' names), or a
+      prebuilt `want=want_fields(fields)` set, which takes precedence.
     - Expands common nested objects into dedicated columns.
     - Falls back to JSON strings for unknown dicts/lists.
     """
     out: Dict[str, Any] = {}
 
-    # Normalize field list (strip + ensure 'places.' prefix handling)
-    norm_fields = [f.strip() for f in fields if f and f.strip()]
-    # Provide a quick membership test that tolerates presence/absence of 'places.' prefix
-    def _want(key: str) -> bool:
-        return (key in norm_fields) or (("places." + key) in norm_fields)
+    if want is None:
+        want = want_fields(fields)
+    _want = want.__contains__
 
     # --- straightforward scalar/known fields
     if _want("id"):                    out["id"] = p.get("id")
@@ -212,15 +243,7 @@ def flatten_place(p: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
 
     # --- catch-all: for any requested field we didn’t explicitly expand,
     #     provide a JSON column so nothing “vanishes”.
-    requested_keys = {f.replace("places.", "") for f in norm_fields}
-    materialized = set(k for k in [
-        "id","name","displayName","formattedAddress","shortFormattedAddress","primaryType",
-        "primaryTypeDisplayName","internationalPhoneNumber","websiteUri","googleMapsUri",
-        "businessStatus","pureServiceAreaBusiness","rating","userRatingCount","types",
-        "location","viewport","plusCode","priceLevel","priceRange","currentOpeningHours",
-        "regularOpeningHours","containingPlaces","addressComponents","reviews","reviewSummary",
-    ] if _want(k))
-    for k in (requested_keys - materialized):
+    for k in (want - _HANDLED_KEYS):
         val = _get(p, k)
         if isinstance(val, dict) or isinstance(val, list):
             out[f"{k}_json"] = _as_json(val)
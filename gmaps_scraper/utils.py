@@ -1,30 +1,33 @@
 from __future__ import annotations
-import csv, json, re, time
+import csv, functools, json, re, time
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import orjson  # fast path for (de)serialization; stdlib json otherwise
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import pyarrow as pa  # columnar CSV writer; stdlib csv otherwise
+    from pyarrow import csv as pacsv
+except ImportError:  # pragma: no cover
+    pa = None
 
 __all__ = [
     "slugify", "now_stamp", "write_csv", "write_json",
     "_get", "_as_json", "_join",
 ]
 
-# _slug_re = re.compile(r"[^a-z0-9]+")
+# keep Unicode alphanumerics (e.g. "cafés", "ñoquis"), map separators to '-', drop the rest
+_slug_drop_re = re.compile(r"[^\w \-/,.:]")
+_slug_sep_re = re.compile(r"[ \-_/,.:]+")
 
 
 def slugify(s: str) -> str:
-    out = []
-    for ch in s.lower():
-        if ch.isalnum():
-            out.append(ch)
-        elif ch in [' ', '-', '_', '/', ',', '.', ':']:
-            out.append('-')
-    slug = ''.join(out)
-    while '--' in slug:
-        slug = slug.replace('--', '-')
-    slug = slug.strip('-')
-    return slug or 'query'
-
+    slug = _slug_sep_re.sub("-", _slug_drop_re.sub("", s.lower())).strip("-")
+    return slug or "query"
 
 
 def now_stamp() -> str:
@@ -39,20 +42,47 @@ def write_csv(rows: List[Dict[str, Any]], path: str | Path) -> None:
     # deterministic column order: union of keys across rows, sorted with common ones front
     common = ["id","resource_name","display_name","formatted_address","lat","lng",
               "primary_type","types","rating","user_ratings_total","phone","website"]
-    cols = []
-    seen = set()
-    for c in common:
-        if any(c in r for r in rows):
-            cols.append(c); seen.add(c)
+    # single pass: dict keys keep first-seen order (values are irrelevant)
+    seen: Dict[str, Any] = {}
     for r in rows:
-        for k in r.keys():
-            if k not in seen:
-                cols.append(k); seen.add(k)
+        seen.update(r)
+    front = [c for c in common if c in seen]
+    front_set = set(front)
+    cols = front + [k for k in seen if k not in front_set]
+    if pa is not None and _write_csv_arrow(rows, cols, path):
+        return
     with path.open("w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=cols)
+        # cols covers every key, so extras can't occur; missing keys -> ""
+        w = csv.DictWriter(f, fieldnames=cols, restval="", extrasaction="ignore")
         w.writeheader()
-        for r in rows:
-            w.writerow({k: r.get(k) for k in cols})
+        w.writerows(rows)
+
+def _arrow_keeps(t: Any) -> bool:
+    # types Arrow writes exactly as csv.DictWriter would; everything else
+    # (bool, float, struct/list, binary, ...) goes through str()
+    return pa.types.is_integer(t) or pa.types.is_string(t) or pa.types.is_large_string(t) or pa.types.is_null(t)
+
+def _write_csv_arrow(rows: List[Dict[str, Any]], cols: List[str], path: Path) -> bool:
+    """
+    Write via pyarrow, typing each column separately. Returns False (use the
+    stdlib writer) for a single column with missing values: Arrow would emit
+    those rows as blank lines, which CSV readers skip.
+    """
+    arrays = []
+    for c in cols:
+        vals = [r.get(c) for r in rows]
+        if len(cols) == 1 and any(v is None for v in vals):
+            return False
+        try:
+            arr = pa.array(vals)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+            arr = None  # mixed types, ints beyond int64, arbitrary objects
+        if arr is None or not _arrow_keeps(arr.type):
+            arr = pa.array([None if v is None else str(v) for v in vals], pa.string())
+        arrays.append(arr)
+    table = pa.Table.from_arrays(arrays, names=cols)
+    pacsv.write_csv(table, str(path), write_options=pacsv.WriteOptions(include_header=True))
+    return True
 
 # legacy
 # def write_csv(rows: List[Dict], path: str) -> None:
@@ -71,6 +101,12 @@ def write_csv(rows: List[Dict[str, Any]], path: str | Path) -> None:
 def write_json(obj: Any, path: str | Path) -> None:
     path = Path(path)
     path.parent.mkdir(parents=True, exist_ok=True)
+    if orjson is not None:
+        try:
+            path.write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+            return
+        except TypeError:
+            pass  # e.g. ints beyond 64 bits; the stdlib encoder handles them
     path.write_text(json.dumps(obj, ensure_ascii=False, indent=2), encoding="utf-8")
 
 
@@ -82,9 +118,13 @@ def write_json(obj: Any, path: str | Path) -> None:
 # --- helpers ---------------------------------------------------------------
 
 
+@functools.lru_cache(maxsize=256)
+def _split_path(path: str) -> Tuple[str, ...]:
+    return tuple(path.split("."))
+
 def _get(d: Dict[str, Any], path: str) -> Any:
     cur = d
-    for part in path.split("."):
+    for part in _split_path(path):
         if not isinstance(cur, dict):
             return None
         cur = cur.get(part)
@@ -93,6 +133,11 @@ def _get(d: Dict[str, Any], path: str) -> Any:
 def _as_json(val: Any) -> Optional[str]:
     if val is None:
         return None
+    if orjson is not None:
+        try:
+            return orjson.dumps(val, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        except TypeError:
+            pass  # e.g. ints beyond 64 bits; the stdlib encoder handles them
     try:
         return json.dumps(val, ensure_ascii=False)
     except Exception: